@@ -0,0 +1,291 @@
+"""Cached locate plans and non-blocking LED dispatch for fast locates."""
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+import requests
+from stock.models import StockLocation
+
+from .mapping import AXES, MappingError, get_axis_range, get_location_mapping
+from .matrix import get_matrix_geometry, matrix_region_runs, runs_to_individual
+from .models import WledInstance
+
+logger = logging.getLogger("inventree")
+
+COLOR_PARENT = "00FF00"
+COLOR_TARGET = "FF0000"
+COLOR_OFF = "000000"
+
+
+def get_instance_table():
+    """Return {wled_id: {"ip", "max_leds", "matrix"}} for all WLED instances."""
+    return {
+        instance.wled_id: {
+            "ip": instance.ip_address,
+            "max_leds": instance.max_leds,
+            "matrix": get_matrix_geometry(instance),
+        }
+        for instance in WledInstance.objects.all()
+    }
+
+
+def build_locate_segments(ancestors, instances):
+    """Build highlight segments per instance for a location and its ancestors.
+
+    `ancestors` runs from the root to the target location. Parents are lit
+    green and the target red, matching `locate_stock_location`.
+
+    On matrix instances a location with both axes on that instance lights
+    the rectangle where its X columns and Y rows cross. All regions of a
+    matrix instance are sent as one run list on segment 0, which the clear
+    stretches over the whole strip.
+    """
+    segments_by_instance = {}
+    individual_by_instance = {}
+    for idx, loc in enumerate(ancestors):
+        mapping = get_location_mapping(loc)
+        color = COLOR_TARGET if idx == len(ancestors) - 1 else COLOR_PARENT
+
+        ranges = {}
+        for axis in AXES:
+            try:
+                current = get_axis_range(mapping, axis)
+            except MappingError as e:
+                logger.debug(f"Invalid metadata value on location {loc.pk}: {e}")
+                continue
+            if current is not None and current[2] in instances:
+                ranges[axis] = current
+
+        x_range, y_range = ranges.get("x"), ranges.get("y")
+        if x_range and y_range and x_range[2] == y_range[2] and instances[x_range[2]]["matrix"]:
+            runs = matrix_region_runs(instances[x_range[2]]["matrix"], x_range[0], x_range[1], y_range[0], y_range[1])
+            individual_by_instance.setdefault(x_range[2], []).extend(runs_to_individual(runs, color))
+            continue
+
+        for led_min, led_max, instance_id in ranges.values():
+            if instances[instance_id]["matrix"]:
+                individual_by_instance.setdefault(instance_id, []).extend((led_min, led_max + 1, color))
+            else:
+                segments_by_instance.setdefault(instance_id, []).append({
+                    "start": led_min,
+                    "stop": led_max + 1,
+                    "col": [color],
+                })
+
+    for instance_id, individual in individual_by_instance.items():
+        segments_by_instance[instance_id] = [{"id": 0, "i": individual}]
+    return segments_by_instance
+
+
+def off_segments(segments):
+    """Return a copy of highlight segments with every color set to off."""
+    result = []
+    for seg in segments:
+        if "i" in seg:
+            result.append({**seg, "i": [COLOR_OFF if isinstance(value, str) else value for value in seg["i"]]})
+        else:
+            result.append({**seg, "col": [COLOR_OFF]})
+    return result
+
+
+def build_locate_plan(location, instances):
+    """Return the LED work needed to locate a StockLocation.
+
+    The plan maps each WLED IP to its LED count and the segments to light;
+    instances with no segments are only cleared.
+    """
+    ancestors = list(location.get_ancestors(include_self=True))
+    segments_by_instance = build_locate_segments(ancestors, instances)
+    return {
+        instance["ip"]: {
+            "max_leds": instance["max_leds"],
+            "segments": segments_by_instance.get(instance_id, []),
+        }
+        for instance_id, instance in instances.items()
+    }
+
+
+PLAN_VERSION_KEY = "inventree_wled_stocktree:locate_plan_version"
+
+
+def get_plan_version():
+    """Return the shared locate plan version, or None if it is unset or unreadable."""
+    try:
+        return cache.get(PLAN_VERSION_KEY)
+    except Exception as e:
+        logger.warning(f"Failed to read locate plan version: {e}")
+        return None
+
+
+def bump_plan_version():
+    """Publish a new locate plan version to all worker processes."""
+    try:
+        cache.set(PLAN_VERSION_KEY, uuid.uuid4().hex, None)
+    except Exception as e:
+        logger.warning(f"Failed to bump locate plan version: {e}")
+
+
+class LocatePlanIndex:
+    """Per-process cache of StockLocation pk -> locate plan.
+
+    Plans are tagged with a version token kept in Django's shared cache.
+    Any StockLocation or WledInstance change publishes a new token once its
+    transaction commits, so every worker drops its plans on the next scan.
+    Entries also expire after `ttl` seconds in case the cache is not shared.
+    """
+
+    def __init__(self, ttl=60):
+        """Create an empty index whose plans expire after `ttl` seconds."""
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._plans = {}
+        self._instances = None
+        self._version = None
+        self._built_at = 0.0
+
+    def invalidate(self, **kwargs):
+        """Drop all cached plans in every process; usable directly as a signal receiver."""
+        with self._lock:
+            self._plans = {}
+            self._instances = None
+
+        def publish():
+            bump_plan_version()
+            with self._lock:
+                self._plans = {}
+                self._instances = None
+
+        # Other workers must not rebuild from data that is not committed yet
+        transaction.on_commit(publish)
+
+    def get(self, location_pk):
+        """Return the locate plan for a location, or None if it does not exist."""
+        version = get_plan_version()
+        with self._lock:
+            expired = time.monotonic() - self._built_at > self.ttl
+            if version != self._version or (self._instances is not None and expired):
+                self._plans = {}
+                self._instances = None
+                self._version = version
+            instances = self._instances
+            plan = self._plans.get(location_pk)
+        if plan is not None:
+            return plan
+
+        if instances is None:
+            # Query outside the lock so scans never wait on each other's DB round-trips
+            instances = get_instance_table()
+            with self._lock:
+                if self._version == version and self._instances is None:
+                    self._instances = instances
+                    self._built_at = time.monotonic()
+
+        try:
+            location = StockLocation.objects.get(pk=location_pk)
+        except StockLocation.DoesNotExist:
+            return None
+        plan = build_locate_plan(location, instances)
+
+        with self._lock:
+            # Only store if no invalidation happened while building
+            if self._version == version and self._instances is instances:
+                self._plans[location_pk] = plan
+        return plan
+
+
+class LedDispatcher:
+    """Send locate plans to WLED devices from a small background pool.
+
+    Each device is handled by at most one worker at a time. That worker
+    keeps sending until no newer work is pending, and work queued while a
+    send is in flight is coalesced to the most recent plan. A burst of
+    scans therefore costs one send in flight plus one waiting per device.
+    Each device has at most one turn-off timer; a new locate cancels it, and
+    when it fires the turn-off goes through the same per-device queue.
+    """
+
+    def __init__(self, max_workers=4, off_delay=10):
+        """Create a dispatcher that turns LEDs off `off_delay` seconds after a locate."""
+        self.off_delay = off_delay
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="wled-locate")
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._in_flight = set()
+        self._timers = {}
+
+    def dispatch(self, plan):
+        """Queue a locate plan and return immediately."""
+        for ip, work in plan.items():
+            self._enqueue(ip, work)
+
+    def _enqueue(self, ip, work, replace=True):
+        with self._lock:
+            if not replace and ip in self._pending:
+                return
+            self._pending[ip] = work
+            if ip in self._in_flight:
+                return
+            self._in_flight.add(ip)
+        self._executor.submit(self._drain, ip)
+
+    def _drain(self, ip):
+        while True:
+            with self._lock:
+                work = self._pending.pop(ip, None)
+                if work is None:
+                    self._in_flight.discard(ip)
+                    return
+            try:
+                self._send(ip, work)
+            except Exception as e:
+                logger.warning(f"Failed to update LEDs on {ip}: {e}")
+
+    def _send(self, ip, work):
+        base_url = f"http://{ip}/json/state"
+        if "off" in work:
+            requests.post(base_url, json={"seg": off_segments(work["off"])}, timeout=3)
+            return
+
+        self._set_timer(ip, None)
+        clear = {"seg": [{"start": 0, "stop": work["max_leds"], "col": [[COLOR_OFF, COLOR_OFF, COLOR_OFF]]}]}
+        requests.post(base_url, json=clear, timeout=3)
+        if work["segments"]:
+            requests.post(base_url, json={"seg": work["segments"]}, timeout=3)
+            timer = threading.Timer(self.off_delay, self._turn_off, args=(ip, work["segments"]))
+            timer.daemon = True
+            self._set_timer(ip, timer)
+
+    def _set_timer(self, ip, timer):
+        """Replace the turn-off timer of a device, cancelling the previous one."""
+        with self._lock:
+            previous = self._timers.pop(ip, None)
+            if timer is not None:
+                self._timers[ip] = timer
+        if previous is not None:
+            previous.cancel()
+        if timer is not None:
+            timer.start()
+
+    def _turn_off(self, ip, segments):
+        with self._lock:
+            # Skip if a newer locate replaced this timer after it fired
+            if self._timers.get(ip) is not threading.current_thread():
+                return
+            del self._timers[ip]
+        # Never replace a newer locate that is already waiting
+        self._enqueue(ip, {"off": segments}, replace=False)
+
+
+locate_plan_index = LocatePlanIndex()
+led_dispatcher = LedDispatcher()
+
+for _sender in (StockLocation, WledInstance):
+    post_save.connect(locate_plan_index.invalidate, sender=_sender, dispatch_uid=f"wled_locate_save_{_sender.__name__}")
+    post_delete.connect(locate_plan_index.invalidate, sender=_sender, dispatch_uid=f"wled_locate_delete_{_sender.__name__}")
@@ -0,0 +1,181 @@
+"""Helpers for the LED mapping stored in StockLocation metadata."""
+
+MAPPING_KEYS = (
+    "wled_x_min",
+    "wled_x_max",
+    "wled_y_min",
+    "wled_y_max",
+    "wled_instance_id_x",
+    "wled_instance_id_y",
+)
+
+AXES = ("x", "y")
+
+BULK_OPERATIONS = ("shift", "renumber", "move", "unmap")
+
+
+class MappingError(ValueError):
+    """Raised when a requested mapping change is invalid."""
+
+
+def empty_mapping():
+    """Return a mapping with every key cleared."""
+    return dict.fromkeys(MAPPING_KEYS)
+
+
+def get_location_mapping(location):
+    """Return the LED mapping keys of a StockLocation as a dict."""
+    metadata = location.metadata or {}
+    return {key: metadata.get(key) for key in MAPPING_KEYS}
+
+
+def set_location_mapping(location, mapping, commit=True):
+    """Write all LED mapping keys to a StockLocation with a single save."""
+    for key in MAPPING_KEYS:
+        location.set_metadata(key, mapping.get(key), commit=False)
+    if commit:
+        location.save()
+
+
+def build_mapping(x_min, x_max, instance_id_x, y_min=None, y_max=None, instance_id_y=None):
+    """Build a mapping from form values, dropping the Y range unless fully set."""
+    mapping = {
+        "wled_x_min": x_min,
+        "wled_x_max": x_max,
+        "wled_instance_id_x": instance_id_x,
+        "wled_y_min": None,
+        "wled_y_max": None,
+        "wled_instance_id_y": None,
+    }
+    if y_min and y_max and instance_id_y:
+        mapping.update({
+            "wled_y_min": y_min,
+            "wled_y_max": y_max,
+            "wled_instance_id_y": instance_id_y,
+        })
+    return mapping
+
+
+def _to_int(value, name):
+    """Convert a request or metadata value to int."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise MappingError(f"Invalid value for {name}: {value!r}") from None
+
+
+def get_axis_range(mapping, axis):
+    """Return (min, max, instance_id) for an axis, or None if it is not mapped."""
+    values = (
+        mapping.get(f"wled_{axis}_min"),
+        mapping.get(f"wled_{axis}_max"),
+        mapping.get(f"wled_instance_id_{axis}"),
+    )
+    if any(value in (None, "") for value in values):
+        return None
+    return tuple(_to_int(value, f"{axis} range") for value in values)
+
+
+def _set_axis_range(mapping, axis, led_min, led_max, instance_id):
+    """Store an axis range in the same string form the dashboard forms use."""
+    mapping[f"wled_{axis}_min"] = str(led_min)
+    mapping[f"wled_{axis}_max"] = str(led_max)
+    mapping[f"wled_instance_id_{axis}"] = str(instance_id)
+
+
+def _selected_axes(params):
+    """Return the axes a bulk operation applies to."""
+    axis = params.get("axis", "both")
+    if axis == "both":
+        return AXES
+    if axis not in AXES:
+        raise MappingError(f"Invalid axis: {axis!r}")
+    return (axis,)
+
+
+def apply_bulk_operation(mappings, operation, params):
+    """Compute new mappings for a bulk operation without touching the database.
+
+    `mappings` is an ordered list of (location_pk, mapping) pairs; the order
+    is used by `renumber`. Returns a list of (location_pk, new_mapping).
+    """
+    if operation not in BULK_OPERATIONS:
+        raise MappingError(f"Unknown operation: {operation!r}")
+
+    if operation == "unmap":
+        return [(pk, empty_mapping()) for pk, _ in mappings]
+
+    axes = _selected_axes(params)
+    if operation == "shift":
+        offset = _to_int(params.get("offset"), "offset")
+    elif operation == "renumber":
+        cursors = {axis: _to_int(params.get("start"), "start") for axis in axes}
+        gap = _to_int(params.get("gap", 0), "gap")
+        if gap < 0:
+            raise MappingError("Gap cannot be negative")
+    else:
+        target_instance = _to_int(params.get("instance_id"), "instance_id")
+
+    result = []
+    for pk, mapping in mappings:
+        new_mapping = dict(mapping)
+        for axis in axes:
+            current = get_axis_range(mapping, axis)
+            if current is None:
+                continue
+            led_min, led_max, instance_id = current
+
+            if operation == "shift":
+                led_min, led_max = led_min + offset, led_max + offset
+            elif operation == "renumber":
+                width = led_max - led_min
+                led_min = cursors[axis]
+                led_max = led_min + width
+                cursors[axis] = led_max + 1 + gap
+            else:
+                instance_id = target_instance
+
+            _set_axis_range(new_mapping, axis, led_min, led_max, instance_id)
+        result.append((pk, new_mapping))
+    return result
+
+
+def validate_mapping(mapping, instances):
+    """Return a list of problems with a mapping, checked against the known instances.
+
+    `instances` is the table returned by `locate.get_instance_table`. When
+    both axes sit on the same matrix instance they are column and row
+    ranges and are checked against the matrix size instead of the strip.
+    """
+    errors = []
+    ranges = {}
+    for axis in AXES:
+        try:
+            current = get_axis_range(mapping, axis)
+        except MappingError as e:
+            errors.append(str(e))
+            continue
+        if current is None:
+            continue
+        if current[2] not in instances:
+            errors.append(f"{axis.upper()}-axis WLED instance {current[2]} does not exist")
+            continue
+        ranges[axis] = current
+
+    shared = {r[2] for r in ranges.values()}
+    matrix = instances[shared.pop()]["matrix"] if len(ranges) == 2 and len(shared) == 1 else None
+    for axis, (led_min, led_max, instance_id) in ranges.items():
+        if matrix:
+            limit = matrix.width if axis == "x" else matrix.height
+            unit = "columns" if axis == "x" else "rows"
+        else:
+            limit = instances[instance_id]["max_leds"]
+            unit = "LEDs"
+        if led_min < 0 or led_min > led_max:
+            errors.append(f"Invalid {axis.upper()} range {led_min}-{led_max}")
+        elif led_max >= limit:
+            errors.append(
+                f"{axis.upper()} range {led_min}-{led_max} exceeds the "
+                f"{limit} {unit} of WLED {instance_id}"
+            )
+    return errors
@@ -0,0 +1,148 @@
+"""LED index computation for WLED instances wired as 2D matrix walls."""
+
+from collections import namedtuple
+from functools import lru_cache
+
+MatrixGeometry = namedtuple("MatrixGeometry", ["width", "height", "panels"])
+
+# One rectangular panel of a wall: its origin in wall columns/rows, its size,
+# whether odd rows run right to left, and the LED index of its first pixel.
+MatrixPanel = namedtuple("MatrixPanel", ["x", "y", "width", "height", "serpentine", "offset"])
+
+PANEL_INT_FIELDS = ("x", "y", "width", "height", "offset")
+
+
+def get_matrix_geometry(instance):
+    """Return the MatrixGeometry of a WledInstance, or None for a plain strip.
+
+    Without an explicit panel list the whole wall is a single panel at
+    `matrix_offset`.
+    """
+    if not instance.is_matrix:
+        return None
+    panels = instance.matrix_panels or [{
+        "x": 0,
+        "y": 0,
+        "width": instance.matrix_width,
+        "height": instance.matrix_height,
+        "serpentine": instance.matrix_serpentine,
+        "offset": instance.matrix_offset,
+    }]
+    return MatrixGeometry(
+        instance.matrix_width,
+        instance.matrix_height,
+        tuple(
+            MatrixPanel(
+                int(panel["x"]),
+                int(panel["y"]),
+                int(panel["width"]),
+                int(panel["height"]),
+                bool(panel.get("serpentine", False)),
+                int(panel["offset"]),
+            )
+            for panel in panels
+        ),
+    )
+
+
+def clean_panels(panels, width, height, max_leds):
+    """Validate a panel list for a wall and return it normalised.
+
+    Panels must fit in the wall and the strip, and no two panels may cover
+    the same wall cell or LED. Raises ValueError describing the first
+    problem found.
+    """
+    if not isinstance(panels, list):
+        raise ValueError('Matrix panels must be a list')
+
+    cleaned = []
+    for idx, panel in enumerate(panels, start=1):
+        if not isinstance(panel, dict):
+            raise ValueError(f'Panel {idx} must be an object')
+        try:
+            values = {field: int(panel[field]) for field in PANEL_INT_FIELDS}
+        except KeyError as e:
+            raise ValueError(f'Panel {idx} is missing {e.args[0]!r}') from None
+        except (TypeError, ValueError):
+            raise ValueError(f'Panel {idx} values must be whole numbers') from None
+
+        if min(values.values()) < 0 or not values["width"] or not values["height"]:
+            raise ValueError(f'Panel {idx} has an invalid size or position')
+        if values["x"] + values["width"] > width or values["y"] + values["height"] > height:
+            raise ValueError(f'Panel {idx} does not fit in the {width}x{height} wall')
+        if values["offset"] + values["width"] * values["height"] > max_leds:
+            raise ValueError(f'Panel {idx} does not fit in {max_leds} LEDs')
+
+        for other_idx, other in enumerate(cleaned, start=1):
+            if _panels_overlap(values, other):
+                raise ValueError(f'Panel {idx} overlaps panel {other_idx} on the wall')
+            if _leds_overlap(values, other):
+                raise ValueError(f'Panel {idx} shares LEDs with panel {other_idx}')
+
+        values["serpentine"] = bool(panel.get("serpentine", False))
+        cleaned.append(values)
+    return cleaned
+
+
+def _panels_overlap(a, b):
+    """Return True if two panels cover a common wall cell."""
+    return (
+        a["x"] < b["x"] + b["width"] and b["x"] < a["x"] + a["width"]
+        and a["y"] < b["y"] + b["height"] and b["y"] < a["y"] + a["height"]
+    )
+
+
+def _leds_overlap(a, b):
+    """Return True if the LED ranges [offset, offset + width * height) of two panels intersect."""
+    return (
+        a["offset"] < b["offset"] + b["width"] * b["height"]
+        and b["offset"] < a["offset"] + a["width"] * a["height"]
+    )
+
+
+def _panel_runs(panel, col_min, col_max, row_min, row_max):
+    """Yield the runs of one panel covering the part of a wall rectangle on it."""
+    col_min, col_max = max(col_min, panel.x), min(col_max, panel.x + panel.width - 1)
+    row_min, row_max = max(row_min, panel.y), min(row_max, panel.y + panel.height - 1)
+    if col_min > col_max or row_min > row_max:
+        return
+
+    first_col, last_col = col_min - panel.x, col_max - panel.x
+    for row in range(row_min - panel.y, row_max - panel.y + 1):
+        if panel.serpentine and row % 2:
+            first, last = panel.width - 1 - last_col, panel.width - 1 - first_col
+        else:
+            first, last = first_col, last_col
+        row_start = panel.offset + row * panel.width
+        yield row_start + first, row_start + last + 1
+
+
+@lru_cache(maxsize=4096)
+def matrix_region_runs(geometry, col_min, col_max, row_min, row_max):
+    """Return the LED runs covering a rectangle of a wall as (start, stop) pairs.
+
+    Each row of the rectangle is one contiguous run per panel it crosses,
+    even on serpentine panels, so the work is proportional to rows times
+    panels and never to the number of LEDs. Runs that touch (e.g.
+    full-width rows or adjacent panels) are merged.
+    """
+    runs = []
+    for panel in geometry.panels:
+        runs.extend(_panel_runs(panel, col_min, col_max, row_min, row_max))
+    runs.sort()
+
+    merged = []
+    for start, stop in runs:
+        if merged and merged[-1][1] >= start:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], stop))
+        else:
+            merged.append((start, stop))
+    return tuple(merged)
+
+
+def runs_to_individual(runs, color):
+    """Encode runs as a flat WLED `i` list: [start, stop, color, ...]."""
+    encoded = []
+    for start, stop in runs:
+        encoded.extend((start, stop, color))
+    return encoded
@@ -0,0 +1,38 @@
+# Generated manually for adding matrix geometry to WledInstance
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventree_wled_stocktree', '0002_add_name_field'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wledinstance',
+            name='matrix_width',
+            field=models.PositiveIntegerField(default=0, verbose_name='Matrix Width'),
+        ),
+        migrations.AddField(
+            model_name='wledinstance',
+            name='matrix_height',
+            field=models.PositiveIntegerField(default=0, verbose_name='Matrix Height'),
+        ),
+        migrations.AddField(
+            model_name='wledinstance',
+            name='matrix_serpentine',
+            field=models.BooleanField(default=False, verbose_name='Serpentine Matrix'),
+        ),
+        migrations.AddField(
+            model_name='wledinstance',
+            name='matrix_offset',
+            field=models.PositiveIntegerField(default=0, verbose_name='Matrix Offset'),
+        ),
+        migrations.AddField(
+            model_name='wledinstance',
+            name='matrix_panels',
+            field=models.JSONField(blank=True, default=list, verbose_name='Matrix Panels'),
+        ),
+    ]
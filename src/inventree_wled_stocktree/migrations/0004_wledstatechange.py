@@ -0,0 +1,47 @@
+# Generated manually for adding the dashboard state changelog
+
+from django.db import migrations, models
+
+
+def create_revision_counter(apps, schema_editor):
+    """Create the single revision counter row."""
+    WledStateRevision = apps.get_model('inventree_wled_stocktree', 'WledStateRevision')
+    WledStateRevision.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventree_wled_stocktree', '0003_add_matrix_geometry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WledStateRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('revision', models.PositiveBigIntegerField(default=0, verbose_name='Revision')),
+            ],
+            options={
+                'verbose_name': 'WLED State Revision',
+                'verbose_name_plural': 'WLED State Revisions',
+            },
+        ),
+        migrations.CreateModel(
+            name='WledStateChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('instance', 'WLED Instance'), ('location', 'Stock Location')], max_length=20, verbose_name='Kind')),
+                ('object_id', models.PositiveIntegerField(verbose_name='Object ID')),
+                ('revision', models.PositiveBigIntegerField(db_index=True, verbose_name='Revision')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+            ],
+            options={
+                'verbose_name': 'WLED State Change',
+                'verbose_name_plural': 'WLED State Changes',
+                'ordering': ['revision'],
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(create_revision_counter, migrations.RunPython.noop),
+    ]
@@ -10,6 +10,11 @@ class WledInstance(models.Model):
     name = models.CharField(max_length=100, blank=True, verbose_name=_("Custom Name"))
     ip_address = models.GenericIPAddressField(verbose_name=_("IP Address"))
     max_leds = models.PositiveIntegerField(default=1, verbose_name=_("Max LEDs"))
+    matrix_width = models.PositiveIntegerField(default=0, verbose_name=_("Matrix Width"))
+    matrix_height = models.PositiveIntegerField(default=0, verbose_name=_("Matrix Height"))
+    matrix_serpentine = models.BooleanField(default=False, verbose_name=_("Serpentine Matrix"))
+    matrix_offset = models.PositiveIntegerField(default=0, verbose_name=_("Matrix Offset"))
+    matrix_panels = models.JSONField(default=list, blank=True, verbose_name=_("Matrix Panels"))
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Created At"))
     updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Updated At"))
     
@@ -30,3 +35,54 @@ class WledInstance(models.Model):
         if self.name:
             return f"{self.name} (WLED {self.wled_id})"
         return f"WLED {self.wled_id}"
+
+    @property
+    def is_matrix(self):
+        """Return True if this instance is wired as a 2D matrix."""
+        return bool(self.matrix_width and self.matrix_height)
+
+
+class WledStateRevision(models.Model):
+    """Single-row counter holding the current dashboard state revision.
+
+    Writers lock this row while recording a change, so revisions become
+    visible in commit order and a poll never skips a late-committing edit.
+    """
+    revision = models.PositiveBigIntegerField(default=0, verbose_name=_("Revision"))
+
+    class Meta:
+        verbose_name = _("WLED State Revision")
+        verbose_name_plural = _("WLED State Revisions")
+        app_label = 'inventree_wled_stocktree'
+
+    def __str__(self):
+        return f"Revision {self.revision}"
+
+
+class WledStateChange(models.Model):
+    """Latest change to a WLED instance or location mapping.
+
+    Only the newest row per tracked object is kept, so the table grows with
+    the number of objects rather than the number of edits.
+    """
+    KIND_INSTANCE = 'instance'
+    KIND_LOCATION = 'location'
+    KIND_CHOICES = [
+        (KIND_INSTANCE, _("WLED Instance")),
+        (KIND_LOCATION, _("Stock Location")),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name=_("Kind"))
+    object_id = models.PositiveIntegerField(verbose_name=_("Object ID"))
+    revision = models.PositiveBigIntegerField(db_index=True, verbose_name=_("Revision"))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Updated At"))
+
+    class Meta:
+        ordering = ['revision']
+        unique_together = [('kind', 'object_id')]
+        verbose_name = _("WLED State Change")
+        verbose_name_plural = _("WLED State Changes")
+        app_label = 'inventree_wled_stocktree'
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} @ {self.revision}"
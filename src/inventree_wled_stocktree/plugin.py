@@ -5,25 +5,49 @@ import logging
 import time
 import threading
 import os
+import re
 
 from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction
 from django.http import JsonResponse, HttpResponse
+from django.middleware.csrf import CsrfViewMiddleware
 from django.shortcuts import redirect, render
 from django.urls import re_path, reverse
 from django.utils.translation import gettext_lazy as _
+from django.views.decorators.csrf import csrf_exempt
 
 import requests
+from rest_framework.exceptions import AuthenticationFailed
 from stock.models import StockLocation, StockItem
+from users.authentication import ApiTokenAuthentication
 
 from common.notifications import NotificationBody
+from InvenTree.helpers import hash_barcode
 from InvenTree.helpers_model import notify_users
 from plugin import InvenTreePlugin
 from plugin.mixins import AppMixin, LocateMixin, SettingsMixin, UrlsMixin
 
+from .locate import (
+    build_locate_segments,
+    get_instance_table,
+    led_dispatcher,
+    locate_plan_index,
+    off_segments,
+)
+from .mapping import (
+    MappingError,
+    apply_bulk_operation,
+    build_mapping,
+    empty_mapping,
+    get_location_mapping,
+    set_location_mapping,
+    validate_mapping,
+)
+from .matrix import clean_panels
 from .models import WledInstance
+from .state import current_revision, get_state, serialize_instance, serialize_location
 
 logger = logging.getLogger("inventree")
 
@@ -72,10 +96,11 @@ class WledInventreePlugin(AppMixin, UrlsMixin, LocateMixin, SettingsMixin, Inven
         try:
             location = StockLocation.objects.get(pk=location_pk)
             print(f"[DEBUG] Located StockLocation: {location}")
-            wled_list = self.get_wled_instances()
-            print(f"[DEBUG] WLED instances: {wled_list}")
-            instance_map = {w["id"]: w["ip"] for w in wled_list if "id" in w and "ip" in w}
-            instance_max_leds = {w["id"]: w.get("max_leds", 1) for w in wled_list if "id" in w}
+            # One snapshot of the instances for both the clears and the segments
+            instances = get_instance_table()
+            print(f"[DEBUG] WLED instances: {instances}")
+            instance_map = {instance_id: instance["ip"] for instance_id, instance in instances.items()}
+            instance_max_leds = {instance_id: instance["max_leds"] for instance_id, instance in instances.items()}
             print(f"[DEBUG] instance_map: {instance_map}")
             print(f"[DEBUG] instance_max_leds: {instance_max_leds}")
 
@@ -118,52 +143,8 @@ class WledInventreePlugin(AppMixin, UrlsMixin, LocateMixin, SettingsMixin, Inven
             print(f"[DEBUG] Ancestors: {ancestors}")
 
             # --- Build segments for all ancestors ---
-            segments_by_instance = {}
-
             # All parent layers (except the last, which is the target) will be green
-            for idx, loc in enumerate(ancestors):
-                print(f"[DEBUG] Processing ancestor idx={idx}, loc={loc}")
-                x_min = loc.get_metadata("wled_x_min")
-                x_max = loc.get_metadata("wled_x_max")
-                y_min = loc.get_metadata("wled_y_min")
-                y_max = loc.get_metadata("wled_y_max")
-                instance_id_x = loc.get_metadata("wled_instance_id_x")
-                instance_id_y = loc.get_metadata("wled_instance_id_y")
-                print(f"[DEBUG] Metadata: x_min={x_min}, x_max={x_max}, y_min={y_min}, y_max={y_max}, instance_id_x={instance_id_x}, instance_id_y={instance_id_y}")
-
-                try:
-                    x_min = int(x_min) if x_min is not None else None
-                    x_max = int(x_max) if x_max is not None else None
-                    y_min = int(y_min) if y_min is not None else None
-                    y_max = int(y_max) if y_max is not None else None
-                    instance_id_x = int(instance_id_x) if instance_id_x is not None else None
-                    instance_id_y = int(instance_id_y) if instance_id_y is not None else None
-                except Exception as e:
-                    print(f"[DEBUG] Exception parsing metadata: {e}")
-                    continue
-
-                # Use green for parents, red for the last (target)
-                is_target = (idx == len(ancestors) - 1)
-                color_x = "FF0000" if is_target else "00FF00"
-                color_y = "FF0000" if is_target else "00FF00"
-
-                # X range
-                if x_min is not None and x_max is not None and instance_id_x in instance_map:
-                    print(f"[DEBUG] Adding X segment for instance {instance_id_x}")
-                    segments_by_instance.setdefault(instance_id_x, []).append({
-                        "start": x_min,
-                        "stop": x_max + 1,
-                        "col": [color_x]
-                    })
-
-                # Y range (optional)
-                if y_min is not None and y_max is not None and instance_id_y in instance_map:
-                    print(f"[DEBUG] Adding Y segment for instance {instance_id_y}")
-                    segments_by_instance.setdefault(instance_id_y, []).append({
-                        "start": y_min,
-                        "stop": y_max + 1,
-                        "col": [color_y]
-                    })
+            segments_by_instance = build_locate_segments(ancestors, instances)
 
             print(f"[DEBUG] segments_by_instance: {segments_by_instance}")
 
@@ -196,6 +177,100 @@ class WledInventreePlugin(AppMixin, UrlsMixin, LocateMixin, SettingsMixin, Inven
         except StockItem.DoesNotExist:
             logger.error(f"StockItem ID {item_pk} does not exist!")
 
+    # Matches InvenTree internal barcodes in short ("INV-SI12") and JSON form
+    SCAN_SHORT_BARCODE = re.compile(r"^(?:[A-Z]+-)?(SI|SL)(\d+)$")
+    SCAN_JSON_KEYS = {"stockitem": "item", "stocklocation": "location"}
+
+    def _resolve_scan_location(self, request):
+        """Return the StockLocation pk addressed by a scan request, or None.
+
+        Accepts `location`, `item` or `barcode` from the POST data.
+        Barcodes may be InvenTree internal barcodes or third-party barcodes
+        linked to a StockItem or StockLocation.
+        """
+        params = request.POST
+        location_pk = params.get("location")
+        item_pk = params.get("item")
+        barcode = (params.get("barcode") or "").strip()
+
+        if barcode and not (location_pk or item_pk):
+            match = self.SCAN_SHORT_BARCODE.match(barcode.upper())
+            if match:
+                kind, pk = match.groups()
+                location_pk, item_pk = (pk, None) if kind == "SL" else (None, pk)
+            else:
+                try:
+                    data = json.loads(barcode)
+                except ValueError:
+                    data = None
+                if isinstance(data, dict):
+                    for key, target in self.SCAN_JSON_KEYS.items():
+                        if key in data:
+                            location_pk, item_pk = (data[key], None) if target == "location" else (None, data[key])
+                            break
+                if not (location_pk or item_pk):
+                    barcode_hash = hash_barcode(barcode)
+                    location_pk = StockLocation.objects.filter(barcode_hash=barcode_hash).values_list("pk", flat=True).first()
+                    if location_pk is None:
+                        return StockItem.objects.filter(barcode_hash=barcode_hash).values_list("location_id", flat=True).first()
+
+        if location_pk:
+            return int(location_pk)
+        if item_pk:
+            return StockItem.objects.filter(pk=int(item_pk)).values_list("location_id", flat=True).first()
+        return None
+
+    def _authenticate_scan(self, request):
+        """Return the user of a scan request, or None if it is not authenticated.
+
+        The scan URL is CSRF-exempt so token clients work; session users are
+        checked against CSRF here instead.
+        """
+        if request.META.get('HTTP_AUTHORIZATION'):
+            try:
+                result = ApiTokenAuthentication().authenticate(request)
+            except AuthenticationFailed:
+                return None
+            return result[0] if result else None
+
+        if CsrfViewMiddleware(lambda req: None).process_view(request, None, (), {}) is not None:
+            return None
+        return request.user
+
+    def view_scan_locate(self, request):
+        """Locate a scanned StockItem or StockLocation without waiting for the LEDs.
+
+        Resolves the target through the cached locate plan index and hands
+        the LED work to a background dispatcher, so the response only costs
+        the lookup.
+
+        Only POST is accepted. Scanners authenticate with an InvenTree API
+        token (`Authorization: Token <key>`), which skips the CSRF check
+        because browsers cannot attach that header cross-site. Requests
+        relying on the session cookie must pass the normal CSRF check.
+        """
+        if request.method != 'POST':
+            return JsonResponse({'error': 'POST method required'}, status=405)
+
+        user = self._authenticate_scan(request)
+        if user is None or not user.is_authenticated:
+            return JsonResponse({'error': 'Authentication required'}, status=403)
+
+        try:
+            location_pk = self._resolve_scan_location(request)
+        except (ValueError, TypeError):
+            return JsonResponse({'error': 'Invalid scan data'}, status=400)
+
+        if location_pk is None:
+            return JsonResponse({'error': 'No location found for scan'}, status=404)
+
+        plan = locate_plan_index.get(location_pk)
+        if plan is None:
+            return JsonResponse({'error': 'Location does not exist'}, status=404)
+
+        led_dispatcher.dispatch(plan)
+        return JsonResponse({'success': True, 'location': location_pk})
+
     def view_off(self, request):
         """Turn off all LEDs."""
         if not superuser_check(request.user):
@@ -208,17 +283,15 @@ class WledInventreePlugin(AppMixin, UrlsMixin, LocateMixin, SettingsMixin, Inven
         if not superuser_check(request.user):
             raise PermissionError("Only superusers can perform this action")
 
+        if request.method != 'POST':
+            return JsonResponse({'error': 'POST method required'}, status=405)
+
         try:
             item = StockLocation.objects.get(pk=pk)
-            item.set_metadata("wled_x_min", None)
-            item.set_metadata("wled_x_max", None)
-            item.set_metadata("wled_y_min", None)
-            item.set_metadata("wled_y_max", None)
-            item.set_metadata("wled_instance_id_x", None)
-            item.set_metadata("wled_instance_id_y", None)
         except StockLocation.DoesNotExist:
-            pass
-        return redirect(self.dashboard_url)
+            return JsonResponse({'error': 'Location does not exist'}, status=404)
+        set_location_mapping(item, empty_mapping())
+        return JsonResponse({'success': True, 'message': f'Removed LED mapping for {item.pathstring}'})
     
     def view_register_wled(self, request, pk=None, led=None):
         print("Registering WLED instance")
@@ -240,6 +313,11 @@ class WledInventreePlugin(AppMixin, UrlsMixin, LocateMixin, SettingsMixin, Inven
         if WledInstance.objects.filter(ip_address=wled_ip).exists():
             return JsonResponse({'error': 'WLED with this IP already registered'}, status=400)
 
+        try:
+            matrix_fields = self._get_matrix_fields(request, int(wled_max_leds))
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
         # Get next available ID
         last_instance = WledInstance.objects.order_by('-wled_id').first()
         new_id = (last_instance.wled_id + 1) if last_instance else 1
@@ -250,7 +328,8 @@ class WledInventreePlugin(AppMixin, UrlsMixin, LocateMixin, SettingsMixin, Inven
                 wled_id=new_id,
                 name=wled_name,
                 ip_address=wled_ip,
-                max_leds=int(wled_max_leds)
+                max_leds=int(wled_max_leds),
+                **matrix_fields,
             )
             print(f"[DEBUG] Created WLED instance: {instance}")
         except Exception as e:
@@ -259,6 +338,42 @@ class WledInventreePlugin(AppMixin, UrlsMixin, LocateMixin, SettingsMixin, Inven
         wled_list = self.get_wled_instances()
         return JsonResponse({'success': True, 'wled_list': wled_list})
     
+    def _get_matrix_fields(self, request, max_leds):
+        """Read and validate the matrix geometry fields of a device form."""
+        try:
+            width = int(request.POST.get('matrix_width') or 0)
+            height = int(request.POST.get('matrix_height') or 0)
+            offset = int(request.POST.get('matrix_offset') or 0)
+        except ValueError:
+            raise ValueError('Matrix values must be whole numbers') from None
+
+        if min(width, height, offset) < 0:
+            raise ValueError('Matrix values cannot be negative')
+        if bool(width) != bool(height):
+            raise ValueError('Matrix width and height must both be set')
+
+        # A wall tiled from several panels lists them explicitly; otherwise
+        # the whole wall is one panel starting at `offset`
+        raw_panels = (request.POST.get('matrix_panels') or '').strip()
+        try:
+            panels = json.loads(raw_panels) if raw_panels else []
+        except ValueError:
+            raise ValueError('Matrix panels must be valid JSON') from None
+        if panels and not width:
+            raise ValueError('Matrix panels require a matrix width and height')
+        panels = clean_panels(panels, width, height, max_leds)
+
+        if not panels and offset + width * height > max_leds:
+            raise ValueError(f'A {width}x{height} matrix at offset {offset} does not fit in {max_leds} LEDs')
+
+        return {
+            'matrix_width': width,
+            'matrix_height': height,
+            'matrix_serpentine': request.POST.get('matrix_serpentine') in ('on', 'true', '1'),
+            'matrix_offset': offset,
+            'matrix_panels': panels,
+        }
+
     def view_edit_wled(self, request, wled_id):
         print(f"Editing WLED instance with ID: {wled_id}")
         # Only superusers allowed
@@ -283,10 +398,17 @@ class WledInventreePlugin(AppMixin, UrlsMixin, LocateMixin, SettingsMixin, Inven
             if WledInstance.objects.filter(ip_address=wled_ip).exclude(wled_id=wled_id).exists():
                 return JsonResponse({'error': 'WLED with this IP already registered'}, status=400)
 
+            try:
+                matrix_fields = self._get_matrix_fields(request, int(wled_max_leds))
+            except ValueError as e:
+                return JsonResponse({'error': str(e)}, status=400)
+
             # Update instance
             instance.name = wled_name
             instance.ip_address = wled_ip
             instance.max_leds = int(wled_max_leds)
+            for field, value in matrix_fields.items():
+                setattr(instance, field, value)
             instance.save()
             
             print(f"[DEBUG] Updated WLED instance: {instance}")
@@ -308,26 +430,27 @@ class WledInventreePlugin(AppMixin, UrlsMixin, LocateMixin, SettingsMixin, Inven
             wled_id = int(wled_id)
             instance = WledInstance.objects.get(wled_id=wled_id)
             
-            # Find all locations using this instance and clean up their metadata
-            all_locations = StockLocation.objects.all()
-            for location in all_locations:
-                instance_id_x = location.get_metadata("wled_instance_id_x")
-                instance_id_y = location.get_metadata("wled_instance_id_y")
-                
-                # Clear metadata if this location uses the instance being deleted
-                if instance_id_x and int(instance_id_x) == wled_id:
-                    location.set_metadata("wled_x_min", None)
-                    location.set_metadata("wled_x_max", None)
-                    location.set_metadata("wled_instance_id_x", None)
-                    print(f"[DEBUG] Cleared X-axis metadata for location {location.id}")
-                
-                if instance_id_y and int(instance_id_y) == wled_id:
-                    location.set_metadata("wled_y_min", None)
-                    location.set_metadata("wled_y_max", None)
-                    location.set_metadata("wled_instance_id_y", None)
-                    print(f"[DEBUG] Cleared Y-axis metadata for location {location.id}")
-            
-            instance.delete()
+            with transaction.atomic():
+                # Find all locations using this instance and clean up their metadata
+                all_locations = StockLocation.objects.all()
+                for location in all_locations:
+                    mapping = get_location_mapping(location)
+                    changed = False
+
+                    # Clear metadata if this location uses the instance being deleted
+                    for axis in ("x", "y"):
+                        instance_id = mapping[f"wled_instance_id_{axis}"]
+                        if instance_id and int(instance_id) == wled_id:
+                            mapping[f"wled_{axis}_min"] = None
+                            mapping[f"wled_{axis}_max"] = None
+                            mapping[f"wled_instance_id_{axis}"] = None
+                            changed = True
+                            print(f"[DEBUG] Cleared {axis.upper()}-axis metadata for location {location.id}")
+
+                    if changed:
+                        set_location_mapping(location, mapping)
+
+                instance.delete()
             print(f"[DEBUG] Deleted WLED instance with ID: {wled_id}")
             
             wled_list = self.get_wled_instances()
@@ -356,27 +479,15 @@ class WledInventreePlugin(AppMixin, UrlsMixin, LocateMixin, SettingsMixin, Inven
             instance_id_x = request.POST.get("wled_instance_id_x")
             instance_id_y = request.POST.get("wled_instance_id_y")
 
-            # Validate that the instances exist
-            if instance_id_x and not WledInstance.objects.filter(wled_id=int(instance_id_x)).exists():
-                return JsonResponse({'error': 'X-axis WLED instance does not exist'}, status=400)
-            
-            if instance_id_y and not WledInstance.objects.filter(wled_id=int(instance_id_y)).exists():
-                return JsonResponse({'error': 'Y-axis WLED instance does not exist'}, status=400)
+            # Validate instances and ranges (columns/rows on matrix instances)
+            mapping = build_mapping(x_min, x_max, instance_id_x, y_min, y_max, instance_id_y)
+            errors = validate_mapping(mapping, get_instance_table())
+            if errors:
+                return JsonResponse({'error': '; '.join(errors), 'errors': errors}, status=400)
 
             # Update metadata
-            location.set_metadata("wled_x_min", x_min)
-            location.set_metadata("wled_x_max", x_max)
-            location.set_metadata("wled_instance_id_x", instance_id_x)
-            
-            if y_min and y_max and instance_id_y:
-                location.set_metadata("wled_y_min", y_min)
-                location.set_metadata("wled_y_max", y_max)
-                location.set_metadata("wled_instance_id_y", instance_id_y)
-            else:
-                location.set_metadata("wled_y_min", None)
-                location.set_metadata("wled_y_max", None)
-                location.set_metadata("wled_instance_id_y", None)
-            
+            set_location_mapping(location, mapping)
+
             print(f"[DEBUG] Updated location {location.id} metadata")
             return JsonResponse({'success': True, 'message': f'Updated LED mapping for {location.pathstring}'})
             
@@ -385,72 +496,123 @@ class WledInventreePlugin(AppMixin, UrlsMixin, LocateMixin, SettingsMixin, Inven
         except Exception as e:
             return JsonResponse({'error': f'Failed to update location: {str(e)}'}, status=500)
 
+    def view_bulk_edit_locations(self, request):
+        """Apply one mapping change to many locations in a single transaction.
+
+        Expects a JSON body such as
+        `{"location_ids": [1, 2], "operation": "shift", "axis": "x", "offset": 5}`.
+        Supported operations are `shift` (offset), `renumber` (start, gap),
+        `move` (instance_id) and `unmap`. The locations are locked and read
+        inside the transaction, all new mappings are validated before
+        anything is written, and each location is saved exactly once.
+        """
+        if not superuser_check(request.user):
+            raise PermissionError("Only superusers can perform this action")
+
+        if request.method != 'POST':
+            return JsonResponse({'error': 'POST method required'}, status=405)
+
+        try:
+            payload = json.loads(request.body or b"{}")
+            location_ids = [int(pk) for pk in payload.get("location_ids", [])]
+        except (ValueError, TypeError, AttributeError):
+            return JsonResponse({'error': 'Invalid request body'}, status=400)
+
+        if not location_ids:
+            return JsonResponse({'error': 'No locations selected'}, status=400)
+
+        instances = get_instance_table()
+        try:
+            with transaction.atomic():
+                # Lock the rows so concurrent bulk edits start from each other's
+                # results and other metadata keys are not overwritten with stale data
+                locations = {
+                    location.pk: location
+                    for location in StockLocation.objects.select_for_update().filter(pk__in=location_ids).order_by('pk')
+                }
+                missing = [pk for pk in location_ids if pk not in locations]
+                if missing:
+                    return JsonResponse({'error': f'Locations do not exist: {missing}'}, status=404)
+
+                # Keep the order the client sent, `renumber` depends on it
+                current = [(pk, get_location_mapping(locations[pk])) for pk in dict.fromkeys(location_ids)]
+
+                try:
+                    updated = apply_bulk_operation(current, payload.get("operation"), payload)
+                except MappingError as e:
+                    return JsonResponse({'error': str(e)}, status=400)
+
+                errors = []
+                for pk, mapping in updated:
+                    errors.extend(
+                        f"{locations[pk].pathstring}: {error}"
+                        for error in validate_mapping(mapping, instances)
+                    )
+                if errors:
+                    return JsonResponse({'error': 'Validation failed', 'errors': errors}, status=400)
+
+                for pk, mapping in updated:
+                    set_location_mapping(locations[pk], mapping)
+        except Exception as e:
+            return JsonResponse({'error': f'Failed to update locations: {str(e)}'}, status=500)
+
+        logger.debug(f"Bulk {payload.get('operation')} updated {len(updated)} locations")
+        return JsonResponse({
+            'success': True,
+            'message': f'Updated {len(updated)} location(s)',
+            'locations': [{'id': pk, **mapping} for pk, mapping in updated],
+        })
 
-        
 
     def view_register(self, request, pk=None, led=None, context=None):
         """Register one or two LED ranges and their WLED instances."""
         if not superuser_check(request.user):
             raise PermissionError("Only superusers can perform this action")
 
-        if request.method == "POST":
-            pk = request.POST.get("stocklocation")
-            x_min = request.POST.get("x_min")
-            x_max = request.POST.get("x_max")
-            y_min = request.POST.get("y_min")
-            y_max = request.POST.get("y_max")
-            instance_id_x = request.POST.get("wled_instance_id_x")
-            instance_id_y = request.POST.get("wled_instance_id_y")
+        if request.method != 'POST':
+            return JsonResponse({'error': 'POST method required'}, status=405)
 
-            try:
-                item = StockLocation.objects.get(pk=pk)
-                item.set_metadata("wled_x_min", x_min)
-                item.set_metadata("wled_x_max", x_max)
-                item.set_metadata("wled_instance_id_x", instance_id_x)
-                if y_min and y_max and instance_id_y:
-                    item.set_metadata("wled_y_min", y_min)
-                    item.set_metadata("wled_y_max", y_max)
-                    item.set_metadata("wled_instance_id_y", instance_id_y)
-                else:
-                    item.set_metadata("wled_y_min", None)
-                    item.set_metadata("wled_y_max", None)
-                    item.set_metadata("wled_instance_id_y", None)
-                messages.success(request, f"Registered LED range(s) for StockLocation {item.pathstring}")
-            except StockLocation.DoesNotExist:
-                messages.error(request, "StockLocation does not exist.")
-                return redirect(self.dashboard_url)
-
-        return redirect(self.dashboard_url)
+        pk = request.POST.get("stocklocation")
+        x_min = request.POST.get("x_min")
+        x_max = request.POST.get("x_max")
+        y_min = request.POST.get("y_min")
+        y_max = request.POST.get("y_max")
+        instance_id_x = request.POST.get("wled_instance_id_x")
+        instance_id_y = request.POST.get("wled_instance_id_y")
+
+        mapping = build_mapping(x_min, x_max, instance_id_x, y_min, y_max, instance_id_y)
+        errors = validate_mapping(mapping, get_instance_table())
+        if errors:
+            return JsonResponse({'error': '; '.join(errors), 'errors': errors}, status=400)
+
+        try:
+            item = StockLocation.objects.get(pk=pk)
+        except (StockLocation.DoesNotExist, ValueError):
+            return JsonResponse({'error': 'StockLocation does not exist'}, status=404)
+        set_location_mapping(item, mapping)
+        return JsonResponse({'success': True, 'message': f'Registered LED range(s) for {item.pathstring}'})
 
     def view_dashboard(self, request):
         """Custom dashboard view for LED registration."""
         if not superuser_check(request.user):
             raise PermissionError("Only superusers can view the LED dashboard")
 
+        # Read the revision first so changes made while rendering are fetched by the next poll
+        state_revision = current_revision()
+
         # Get all stock locations (both mapped and unmapped)
         all_stocklocations = StockLocation.objects.all()
         mapped_stocklocations = StockLocation.objects.filter(metadata__isnull=False)
         wled_instances = self.get_wled_instances()
 
+        for inst in wled_instances:
+            inst['matrix_panels_json'] = json.dumps(inst['matrix_panels']) if inst['matrix_panels'] else ''
+
         target_locs = []
         for loc in mapped_stocklocations:
-            x_min = loc.get_metadata("wled_x_min")
-            x_max = loc.get_metadata("wled_x_max")
-            y_min = loc.get_metadata("wled_y_min")
-            y_max = loc.get_metadata("wled_y_max")
-            instance_id_x = loc.get_metadata("wled_instance_id_x")
-            instance_id_y = loc.get_metadata("wled_instance_id_y")
-            if x_min and x_max:
-                target_locs.append({
-                    "name": loc.pathstring,
-                    "x_min": x_min,
-                    "x_max": x_max,
-                    "y_min": y_min,
-                    "y_max": y_max,
-                    "id": loc.id,
-                    "instance_x": instance_id_x,
-                    "instance_y": instance_id_y,
-                })
+            row = serialize_location(loc)
+            if row is not None:
+                target_locs.append(row)
 
         max_leds = self.get_setting("MAX_LEDS")
 
@@ -463,24 +625,44 @@ class WledInventreePlugin(AppMixin, UrlsMixin, LocateMixin, SettingsMixin, Inven
             'all_stocklocations': all_stocklocations,
             'max_leds': max_leds,
             'wled_instances': wled_instances,
+            'state_revision': state_revision,
         })
 
+    def view_state(self, request):
+        """Return dashboard rows changed since `?since=<revision>`.
+
+        Without `since` the full state is returned. The response carries the
+        current revision as ETag, so a poll with a matching If-None-Match
+        costs a single-row lookup and returns 304.
+        """
+        if not superuser_check(request.user):
+            raise PermissionError("Only superusers can view the LED dashboard")
+
+        revision = current_revision()
+        etag = f'"wled-state-{revision}"'
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponse(status=304)
+            response['ETag'] = etag
+            return response
+
+        since = request.GET.get('since')
+        try:
+            since = int(since) if since not in (None, '') else None
+        except ValueError:
+            return JsonResponse({'error': 'Invalid revision'}, status=400)
+
+        response = JsonResponse(get_state(since, revision))
+        response['ETag'] = etag
+        response['Cache-Control'] = 'no-cache'
+        return response
+
 
     
     def get_wled_instances(self):
         """Get WLED instances from database."""
         try:
             instances = WledInstance.objects.all()
-            wled_list = [
-                {
-                    'id': instance.wled_id,
-                    'name': instance.name,
-                    'ip': instance.ip_address,
-                    'max_leds': instance.max_leds,
-                    'display_name': instance.display_name
-                }
-                for instance in instances
-            ]
+            wled_list = [serialize_instance(instance) for instance in instances]
             print(f"[DEBUG] Loaded WLED instances from database: {wled_list}")
             return wled_list
         except Exception as e:
@@ -497,6 +679,9 @@ class WledInventreePlugin(AppMixin, UrlsMixin, LocateMixin, SettingsMixin, Inven
             re_path(r"^edit-wled/(?P<wled_id>\d+)/$", self.view_edit_wled, name="edit-wled"),
             re_path(r"^unregister-wled/(?P<wled_id>\d+)/$", self.view_unregister_wled, name="unregister-wled"),
             re_path(r"^edit-location/(?P<location_id>\d+)/$", self.view_edit_location, name="edit-location"),
+            re_path(r"^state/$", self.view_state, name="state"),
+            re_path(r"^scan/$", csrf_exempt(self.view_scan_locate), name="scan-locate"),
+            re_path(r"^bulk-edit-locations/$", self.view_bulk_edit_locations, name="bulk-edit-locations"),
         ]
 
     @staticmethod
@@ -581,12 +766,7 @@ class WledInventreePlugin(AppMixin, UrlsMixin, LocateMixin, SettingsMixin, Inven
             import time
             debug_log(f"Sleeping 10s before turning off segments on {ip}")
             time.sleep(10)
-            off_segments = []
-            for seg in segments:
-                off_seg = seg.copy()
-                off_seg["col"] = ["000000"]
-                off_segments.append(off_seg)
-            off_payload = {"seg": off_segments}
+            off_payload = {"seg": off_segments(segments)}
             try:
                 debug_log(f"Turning off segments on {ip} with payload: {off_payload}")
                 requests.post(base_url, json=off_payload, timeout=3)
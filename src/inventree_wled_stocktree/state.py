@@ -0,0 +1,144 @@
+"""Revisioned dashboard state so clients can fetch only what changed."""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from stock.models import StockLocation
+
+from .mapping import MAPPING_KEYS
+from .models import WledInstance, WledStateChange, WledStateRevision
+
+
+def serialize_instance(instance):
+    """Return the dashboard representation of a WledInstance."""
+    return {
+        'id': instance.wled_id,
+        'name': instance.name,
+        'ip': instance.ip_address,
+        'max_leds': instance.max_leds,
+        'matrix_width': instance.matrix_width,
+        'matrix_height': instance.matrix_height,
+        'matrix_serpentine': instance.matrix_serpentine,
+        'matrix_offset': instance.matrix_offset,
+        'matrix_panels': instance.matrix_panels,
+        'is_matrix': instance.is_matrix,
+        'display_name': instance.display_name,
+    }
+
+
+def serialize_location(location):
+    """Return the dashboard row for a mapped StockLocation, or None if it is unmapped."""
+    x_min = location.get_metadata("wled_x_min")
+    x_max = location.get_metadata("wled_x_max")
+    if not (x_min and x_max):
+        return None
+    return {
+        "name": location.pathstring,
+        "x_min": x_min,
+        "x_max": x_max,
+        "y_min": location.get_metadata("wled_y_min"),
+        "y_max": location.get_metadata("wled_y_max"),
+        "id": location.id,
+        "instance_x": location.get_metadata("wled_instance_id_x"),
+        "instance_y": location.get_metadata("wled_instance_id_y"),
+    }
+
+
+def current_revision():
+    """Return the latest committed dashboard state revision (0 if nothing was recorded yet)."""
+    return WledStateRevision.objects.filter(pk=1).values_list('revision', flat=True).first() or 0
+
+
+def record_change(kind, object_id):
+    """Bump the revision for one object, replacing its previous change row.
+
+    The counter row stays locked until the surrounding transaction commits.
+    Only one uncommitted revision can exist at a time, and it is always
+    newer than every committed one, so `revision > since` never skips a
+    change that commits late.
+    """
+    with transaction.atomic():
+        counter, _ = WledStateRevision.objects.select_for_update().get_or_create(pk=1)
+        counter.revision += 1
+        counter.save(update_fields=['revision'])
+        WledStateChange.objects.update_or_create(
+            kind=kind,
+            object_id=object_id,
+            defaults={'revision': counter.revision},
+        )
+
+
+def get_state(since=None, revision=None):
+    """Return the dashboard rows changed after `since`, or everything if `since` is None.
+
+    A `since` ahead of the current revision (e.g. after a database restore)
+    also yields the full state. Removed rows are the changed ids that no
+    longer exist or are no longer mapped.
+    """
+    if revision is None:
+        revision = current_revision()
+
+    state = {
+        'revision': revision,
+        'full': since is None or since > revision,
+        'instances': [],
+        'locations': [],
+        'removed_instances': [],
+        'removed_locations': [],
+    }
+
+    if state['full']:
+        state['instances'] = [serialize_instance(instance) for instance in WledInstance.objects.all()]
+        state['locations'] = [
+            row for row in map(serialize_location, StockLocation.objects.filter(metadata__isnull=False))
+            if row is not None
+        ]
+        return state
+
+    changes = WledStateChange.objects.filter(revision__gt=since, revision__lte=revision)
+    instance_ids = set(changes.filter(kind=WledStateChange.KIND_INSTANCE).values_list('object_id', flat=True))
+    location_ids = set(changes.filter(kind=WledStateChange.KIND_LOCATION).values_list('object_id', flat=True))
+
+    if instance_ids:
+        instances = WledInstance.objects.filter(wled_id__in=instance_ids)
+        state['instances'] = [serialize_instance(instance) for instance in instances]
+        state['removed_instances'] = sorted(instance_ids - {row['id'] for row in state['instances']})
+
+    if location_ids:
+        for location in StockLocation.objects.filter(pk__in=location_ids):
+            row = serialize_location(location)
+            if row is not None:
+                state['locations'].append(row)
+        state['removed_locations'] = sorted(location_ids - {row['id'] for row in state['locations']})
+
+    return state
+
+
+def _is_tracked_location(location):
+    """Return True if a location carries (or once carried) LED mapping metadata."""
+    metadata = location.metadata or {}
+    return any(key in metadata for key in MAPPING_KEYS)
+
+
+def _location_saved(sender, instance, **kwargs):
+    if _is_tracked_location(instance):
+        record_change(WledStateChange.KIND_LOCATION, instance.pk)
+
+
+def _location_deleted(sender, instance, **kwargs):
+    if _is_tracked_location(instance):
+        record_change(WledStateChange.KIND_LOCATION, instance.pk)
+
+
+def _instance_saved(sender, instance, **kwargs):
+    record_change(WledStateChange.KIND_INSTANCE, instance.wled_id)
+
+
+def _instance_deleted(sender, instance, **kwargs):
+    record_change(WledStateChange.KIND_INSTANCE, instance.wled_id)
+
+
+post_save.connect(_location_saved, sender=StockLocation, dispatch_uid="wled_state_location_save")
+post_delete.connect(_location_deleted, sender=StockLocation, dispatch_uid="wled_state_location_delete")
+post_save.connect(_instance_saved, sender=WledInstance, dispatch_uid="wled_state_instance_save")
+post_delete.connect(_instance_deleted, sender=WledInstance, dispatch_uid="wled_state_instance_delete")
@@ -18,6 +18,9 @@ function initializeDashboard() {
     document.documentElement.setAttribute('data-theme', savedTheme);
     updateThemeIcon(savedTheme);
     
+    // Keep the dashboard in sync with other users' changes
+    setInterval(refreshDashboardState, STATE_POLL_INTERVAL);
+
     console.log('Dashboard initialized successfully');
 }
 
@@ -99,13 +102,19 @@ function showAddDeviceModal() {
     showModal('addDeviceModal');
 }
 
-function editDevice(deviceId, deviceName, deviceIp, deviceMaxLeds) {
+function editDevice(deviceId, deviceName, deviceIp, deviceMaxLeds, matrixWidth, matrixHeight, matrixOffset, matrixSerpentine) {
     console.log('editDevice called with:', deviceId, deviceName, deviceIp, deviceMaxLeds);
     
     // Populate the edit form
     document.getElementById('edit_wled_name').value = deviceName || '';
     document.getElementById('edit_wled_ip').value = deviceIp;
     document.getElementById('edit_wled_max_leds').value = deviceMaxLeds;
+    document.getElementById('edit_matrix_width').value = matrixWidth || 0;
+    document.getElementById('edit_matrix_height').value = matrixHeight || 0;
+    document.getElementById('edit_matrix_offset').value = matrixOffset || 0;
+    document.getElementById('edit_matrix_serpentine').checked = !!matrixSerpentine;
+    const deviceCard = document.querySelector(`.device-card[data-device-id="${deviceId}"]`);
+    document.getElementById('edit_matrix_panels').value = deviceCard ? deviceCard.getAttribute('data-matrix-panels') : '';
     
     // Set the form action
     const form = document.getElementById('editDeviceForm');
@@ -272,12 +281,13 @@ function removeLocation(locationId) {
                 'X-CSRFToken': document.querySelector('[name="csrfmiddlewaretoken"]').value
             }
         })
-        .then(response => {
-            if (response.ok) {
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
                 showNotification('Location mapping removed successfully!', 'success');
-                setTimeout(() => location.reload(), 1000);
+                refreshDashboardState();
             } else {
-                showNotification('Failed to remove location mapping', 'error');
+                showNotification(data.error || 'Failed to remove location mapping', 'error');
             }
         })
         .catch(error => {
@@ -578,13 +588,14 @@ function submitLocationForm(e) {
             'X-CSRFToken': form.querySelector('[name="csrfmiddlewaretoken"]').value
         }
     })
-    .then(response => {
-        if (response.ok) {
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
             showNotification('Location mapped successfully!', 'success');
             closeModal('addLocationModal');
-            setTimeout(() => location.reload(), 1000);
+            refreshDashboardState();
         } else {
-            showNotification('Failed to map location', 'error');
+            showNotification(data.error || 'Failed to map location', 'error');
         }
     })
     .catch(error => {
@@ -645,14 +656,6 @@ function testDevice(ip) {
 }
 
 // Location Actions
-function removeLocation(locationId) {
-    if (!confirm('Are you sure you want to unmap this location?')) {
-        return;
-    }
-    
-    window.location.href = `/plugin/inventree-wled-stocktree/unregister/${locationId}/`;
-}
-
 function testLocation(locationId) {
     showNotification('Testing location...', 'info');
     // This would trigger the locate_stock_location function
@@ -916,7 +919,7 @@ function submitEditLocationForm(e) {
         if (data.success) {
             showNotification('Location mapping updated successfully!', 'success');
             closeModal('editLocationModal');
-            setTimeout(() => location.reload(), 1000);
+            refreshDashboardState();
         } else {
             showNotification(data.error || 'Failed to update location mapping', 'error');
         }
@@ -930,3 +933,272 @@ function submitEditLocationForm(e) {
         submitBtn.disabled = false;
     });
 }
+
+// Bulk Location Editing
+function getSelectedLocationIds() {
+    return Array.from(document.querySelectorAll('.location-select:checked')).map(cb => parseInt(cb.value));
+}
+
+function updateBulkToolbar() {
+    const selected = getSelectedLocationIds();
+    const toolbar = document.getElementById('bulk_toolbar');
+    if (!toolbar) {
+        return;
+    }
+    toolbar.style.display = selected.length > 0 ? 'flex' : 'none';
+    document.getElementById('bulk_selected_count').textContent = selected.length;
+
+    const allCheckboxes = document.querySelectorAll('.location-select');
+    const selectAll = document.getElementById('select_all_locations');
+    selectAll.checked = selected.length > 0 && selected.length === allCheckboxes.length;
+    selectAll.indeterminate = selected.length > 0 && selected.length < allCheckboxes.length;
+}
+
+function toggleAllLocations(checked) {
+    document.querySelectorAll('.location-select').forEach(cb => {
+        cb.checked = checked;
+    });
+    updateBulkToolbar();
+}
+
+function clearLocationSelection() {
+    toggleAllLocations(false);
+}
+
+function toggleBulkFields() {
+    const operation = document.getElementById('bulk_operation').value;
+    document.querySelectorAll('#bulkEditForm [data-bulk-field]').forEach(field => {
+        const operations = field.getAttribute('data-bulk-field').split(' ');
+        field.style.display = operations.includes(operation) ? 'block' : 'none';
+    });
+}
+
+function showBulkEditModal() {
+    const selected = getSelectedLocationIds();
+    if (selected.length === 0) {
+        showNotification('Please select at least one location', 'error');
+        return;
+    }
+    document.getElementById('bulk_edit_count').textContent = selected.length;
+    toggleBulkFields();
+    showModal('bulkEditModal');
+}
+
+function submitBulkEditForm(e) {
+    e.preventDefault();
+
+    const form = e.target;
+    const formData = new FormData(form);
+    const submitBtn = form.querySelector('button[type="submit"]');
+    const operation = formData.get('operation');
+
+    const payload = {
+        location_ids: getSelectedLocationIds(),
+        operation: operation,
+        axis: formData.get('axis'),
+    };
+
+    if (operation === 'shift') {
+        payload.offset = parseInt(formData.get('offset'));
+        if (isNaN(payload.offset) || payload.offset === 0) {
+            showNotification('Please provide a non-zero offset', 'error');
+            return;
+        }
+    } else if (operation === 'renumber') {
+        payload.start = parseInt(formData.get('start'));
+        payload.gap = parseInt(formData.get('gap')) || 0;
+        if (isNaN(payload.start) || payload.start < 0) {
+            showNotification('Please provide a valid first LED', 'error');
+            return;
+        }
+    } else if (operation === 'move') {
+        payload.instance_id = parseInt(formData.get('instance_id'));
+        if (isNaN(payload.instance_id)) {
+            showNotification('Please select a WLED device', 'error');
+            return;
+        }
+    } else if (!confirm(`Are you sure you want to unmap ${payload.location_ids.length} location(s)?`)) {
+        return;
+    }
+
+    // Show loading state
+    const originalText = submitBtn.innerHTML;
+    submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Applying...';
+    submitBtn.disabled = true;
+
+    fetch(form.action, {
+        method: 'POST',
+        body: JSON.stringify(payload),
+        headers: {
+            'Content-Type': 'application/json',
+            'X-CSRFToken': form.querySelector('[name="csrfmiddlewaretoken"]').value
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showNotification(data.message || 'Locations updated successfully!', 'success');
+            closeModal('bulkEditModal');
+            clearLocationSelection();
+            refreshDashboardState();
+        } else {
+            const details = data.errors ? `: ${data.errors.slice(0, 3).join('; ')}` : '';
+            showNotification((data.error || 'Failed to update locations') + details, 'error');
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        showNotification('Network error occurred', 'error');
+    })
+    .finally(() => {
+        submitBtn.innerHTML = originalText;
+        submitBtn.disabled = false;
+    });
+}
+
+// Incremental Dashboard State
+const STATE_POLL_INTERVAL = 5000;
+let stateEtag = null;
+let stateRefreshing = false;
+
+function escapeHtml(value) {
+    const div = document.createElement('div');
+    div.textContent = value == null ? '' : String(value);
+    return div.innerHTML;
+}
+
+function buildLocationRow(loc) {
+    const row = document.createElement('tr');
+    row.setAttribute('data-location-id', loc.id);
+    row.setAttribute('data-location-name', loc.name);
+    row.setAttribute('data-x-min', loc.x_min);
+    row.setAttribute('data-x-max', loc.x_max);
+    row.setAttribute('data-x-instance', loc.instance_x);
+    row.setAttribute('data-y-min', loc.y_min || '');
+    row.setAttribute('data-y-max', loc.y_max || '');
+    row.setAttribute('data-y-instance', loc.instance_y || '');
+
+    const yRange = loc.y_min && loc.y_max
+        ? `<span class="led-range">${escapeHtml(loc.y_min)} - ${escapeHtml(loc.y_max)}</span>
+           <small>on WLED ${escapeHtml(loc.instance_y)}</small>`
+        : '<span class="text-muted">Not mapped</span>';
+    const yBadge = loc.instance_y ? `<span class="device-badge">WLED ${escapeHtml(loc.instance_y)}</span>` : '';
+
+    row.innerHTML = `
+        <td class="select-column">
+            <input type="checkbox" class="location-select" value="${loc.id}" onchange="updateBulkToolbar()">
+        </td>
+        <td><span class="location-id">${loc.id}</span></td>
+        <td>
+            <div class="location-name">
+                <i class="fas fa-folder"></i>
+                ${escapeHtml(loc.name)}
+            </div>
+        </td>
+        <td>
+            <span class="led-range">${escapeHtml(loc.x_min)} - ${escapeHtml(loc.x_max)}</span>
+            <small>on WLED ${escapeHtml(loc.instance_x)}</small>
+        </td>
+        <td>${yRange}</td>
+        <td>
+            <div class="device-badges">
+                <span class="device-badge">WLED ${escapeHtml(loc.instance_x)}</span>
+                ${yBadge}
+            </div>
+        </td>
+        <td>
+            <div class="action-buttons">
+                <button class="btn-icon btn-primary" onclick="testLocation(${loc.id})">
+                    <i class="fas fa-eye"></i>
+                </button>
+                <button class="btn-icon btn-secondary" onclick="editLocation(${loc.id})">
+                    <i class="fas fa-edit"></i>
+                </button>
+                <button class="btn-icon btn-danger" onclick="removeLocation(${loc.id})">
+                    <i class="fas fa-trash"></i>
+                </button>
+            </div>
+        </td>`;
+    return row;
+}
+
+function applyDashboardState(state) {
+    const tbody = document.getElementById('locations_table_body');
+
+    // Device changes touch cards and every device select, so re-render the page for those
+    const devicesChanged = state.full
+        ? state.instances.length !== document.querySelectorAll('.device-card').length
+        : state.instances.length > 0 || state.removed_instances.length > 0;
+    if (devicesChanged || (!tbody && state.locations.length > 0)) {
+        location.reload();
+        return;
+    }
+    if (!tbody) {
+        return;
+    }
+
+    if (state.full) {
+        const current = new Set(state.locations.map(loc => String(loc.id)));
+        tbody.querySelectorAll('tr[data-location-id]').forEach(row => {
+            if (!current.has(row.getAttribute('data-location-id'))) {
+                row.remove();
+            }
+        });
+    }
+
+    state.removed_locations.forEach(id => {
+        const row = tbody.querySelector(`tr[data-location-id="${id}"]`);
+        if (row) {
+            row.remove();
+        }
+    });
+
+    state.locations.forEach(loc => {
+        const existing = tbody.querySelector(`tr[data-location-id="${loc.id}"]`);
+        const row = buildLocationRow(loc);
+        if (existing) {
+            row.querySelector('.location-select').checked = existing.querySelector('.location-select').checked;
+            existing.replaceWith(row);
+        } else {
+            tbody.appendChild(row);
+        }
+    });
+
+    document.getElementById('mapped_locations_count').textContent = tbody.querySelectorAll('tr[data-location-id]').length;
+    updateBulkToolbar();
+}
+
+function refreshDashboardState() {
+    const body = document.body;
+    const stateUrl = body.getAttribute('data-state-url');
+    if (!stateUrl || stateRefreshing || document.hidden) {
+        return;
+    }
+
+    stateRefreshing = true;
+    const headers = {};
+    if (stateEtag) {
+        headers['If-None-Match'] = stateEtag;
+    }
+
+    fetch(`${stateUrl}?since=${body.getAttribute('data-state-revision')}`, {headers: headers, cache: 'no-store'})
+    .then(response => {
+        if (response.status === 304 || !response.ok) {
+            return null;
+        }
+        stateEtag = response.headers.get('ETag');
+        return response.json();
+    })
+    .then(state => {
+        if (state) {
+            body.setAttribute('data-state-revision', state.revision);
+            applyDashboardState(state);
+        }
+    })
+    .catch(error => {
+        console.error('Error refreshing dashboard state:', error);
+    })
+    .finally(() => {
+        stateRefreshing = false;
+    });
+}
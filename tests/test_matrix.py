@@ -0,0 +1,97 @@
+"""Tests for the matrix LED index computation."""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+# matrix.py has no Django dependencies; load it directly so the tests do not
+# need InvenTree (the package __init__ imports the plugin).
+_spec = importlib.util.spec_from_file_location(
+    "wled_matrix", Path(__file__).resolve().parents[1] / "src" / "inventree_wled_stocktree" / "matrix.py"
+)
+matrix = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(matrix)
+
+MatrixGeometry = matrix.MatrixGeometry
+MatrixPanel = matrix.MatrixPanel
+
+
+def panel_dict(x, y, width, height, offset, serpentine=False):
+    return {"x": x, "y": y, "width": width, "height": height, "offset": offset, "serpentine": serpentine}
+
+
+def test_serpentine_odd_rows_are_reversed():
+    panel = MatrixPanel(0, 0, 4, 3, True, 0)
+    geometry = MatrixGeometry(4, 3, (panel,))
+
+    # Row 1 runs right to left: column 0 is LED 7, column 3 is LED 4
+    assert matrix.matrix_region_runs(geometry, 0, 0, 1, 1) == ((7, 8),)
+    assert matrix.matrix_region_runs(geometry, 3, 3, 1, 1) == ((4, 5),)
+    assert matrix.matrix_region_runs(geometry, 1, 2, 0, 2) == ((1, 3), (5, 7), (9, 11))
+
+
+def test_serpentine_full_width_rows_merge():
+    geometry = MatrixGeometry(4, 3, (MatrixPanel(0, 0, 4, 3, True, 5),))
+
+    assert matrix.matrix_region_runs(geometry, 0, 3, 0, 2) == ((5, 17),)
+
+
+def test_rectangle_spanning_panels():
+    left = MatrixPanel(0, 0, 4, 2, False, 0)
+    right = MatrixPanel(4, 0, 4, 2, False, 8)
+    geometry = MatrixGeometry(8, 2, (left, right))
+
+    # The end of row 1 on the left panel touches row 0 of the right panel
+    assert matrix.matrix_region_runs(geometry, 2, 5, 0, 1) == ((2, 4), (6, 10), (12, 14))
+
+
+def test_rectangle_spanning_stacked_panels():
+    top = MatrixPanel(0, 0, 3, 2, True, 20)
+    bottom = MatrixPanel(0, 2, 3, 2, False, 0)
+    geometry = MatrixGeometry(3, 4, (top, bottom))
+
+    assert matrix.matrix_region_runs(geometry, 0, 0, 1, 2) == ((0, 1), (25, 26))
+
+
+def test_panel_runs_clip_to_panel_edges():
+    panel = MatrixPanel(4, 1, 4, 2, False, 10)
+
+    assert list(matrix._panel_runs(panel, 2, 5, 0, 5)) == [(10, 12), (14, 16)]
+    assert list(matrix._panel_runs(panel, 6, 20, 2, 2)) == [(16, 18)]
+
+
+def test_panel_runs_outside_panel_are_empty():
+    panel = MatrixPanel(4, 1, 4, 2, False, 10)
+
+    assert list(matrix._panel_runs(panel, 0, 3, 0, 5)) == []
+    assert list(matrix._panel_runs(panel, 4, 7, 3, 5)) == []
+
+
+def test_region_clipped_at_wall_edge():
+    geometry = MatrixGeometry(4, 3, (MatrixPanel(0, 0, 4, 3, True, 0),))
+
+    assert matrix.matrix_region_runs(geometry, 3, 10, 2, 10) == ((11, 12),)
+
+
+def test_clean_panels_accepts_adjacent_panels():
+    panels = [panel_dict(0, 0, 4, 2, 0), panel_dict(4, 0, 4, 2, 8, serpentine=True)]
+
+    cleaned = matrix.clean_panels(panels, 8, 2, 16)
+
+    assert [p["offset"] for p in cleaned] == [0, 8]
+    assert cleaned[1]["serpentine"] is True
+
+
+def test_clean_panels_rejects_overlapping_rectangles():
+    panels = [panel_dict(0, 0, 4, 2, 0), panel_dict(3, 0, 4, 2, 8)]
+
+    with pytest.raises(ValueError, match="overlaps panel 1"):
+        matrix.clean_panels(panels, 8, 2, 16)
+
+
+def test_clean_panels_rejects_overlapping_led_ranges():
+    panels = [panel_dict(0, 0, 4, 2, 0), panel_dict(4, 0, 4, 2, 7)]
+
+    with pytest.raises(ValueError, match="shares LEDs with panel 1"):
+        matrix.clean_panels(panels, 8, 2, 16)